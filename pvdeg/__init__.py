@@ -1,23 +1,53 @@
+from importlib import import_module
 from importlib.metadata import version
 import logging
 
 from .config import *
 
-# from . import cli
-from . import collection
-from . import degradation
-from . import design
-from . import fatigue
-from . import geospatial
-from . import humidity
-from . import letid
-from . import montecarlo
-from .scenario import Scenario
-from . import spectral
-from . import standards
-from . import temperature
-from . import utilities
-from . import weather
+# Submodules are imported on first attribute access (PEP 562) so that
+# `import pvdeg` does not pull in rex, numba, dask, cartopy, etc. up front.
+_SUBMODULES = {
+    # "cli",
+    "collection",
+    "degradation",
+    "design",
+    "fatigue",
+    "geospatial",
+    "humidity",
+    "letid",
+    "montecarlo",
+    "scenario",
+    "spectral",
+    "standards",
+    "temperature",
+    "utilities",
+    "weather",
+}
+_ATTRIBUTES = {"Scenario": "scenario"}
+
+# keep `from pvdeg import *` exporting the config paths next to the lazy names
+__all__ = sorted(
+    _SUBMODULES
+    | set(_ATTRIBUTES)
+    | {"PVDEG_DIR", "REPO_NAME", "DATA_DIR", "TEST_DIR", "TEST_DATA_DIR"}
+)
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        attr = import_module(f".{name}", __name__)
+    elif name in _ATTRIBUTES:
+        attr = getattr(import_module(f".{_ATTRIBUTES[name]}", __name__), name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    globals()[name] = attr
+    return attr
+
+
+def __dir__():
+    return sorted(set(globals()) | _SUBMODULES | set(_ATTRIBUTES))
+
 
 __version__ = version("pvdeg")
 
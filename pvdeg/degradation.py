@@ -3,18 +3,52 @@
 
 import numpy as np
 import pandas as pd
-from numba import jit, njit
 from rex import NSRDBX
 from rex import Outputs
 from pathlib import Path
+from functools import lru_cache
 from concurrent.futures import ProcessPoolExecutor, as_completed
+import multiprocessing
+from multiprocessing import shared_memory
+import numexpr as ne
 
 from . import temperature
 from . import spectral
 from . import weather
+from . import utilities
 
 # TODO: Clean up all those functions and add gaps functionality
 
+# The numba kernels are built by lru_cache'd factories that compile on first call,
+# so numba is only imported when one of them is needed.
+
+
+def _fast_pow(a, p):
+    """
+    Helper function. Raise a to the power p, skipping the generic pow for the
+    exponents commonly used as fit parameters.
+
+    Parameters
+    ----------
+    a : pandas series, numpy array or float
+        Base
+    p : float
+        Exponent
+
+    Returns
+    -------
+    a_p : pandas series, numpy array or float
+        a ** p
+    """
+    if p == 1:
+        return a
+    elif p == 0.5:
+        return np.sqrt(a)
+    elif p == 2:
+        return a * a
+
+    return a**p
+
 
 def _deg_rate_env(poa_global, temp, temp_chamber, p, Tf):
     """
@@ -45,7 +79,7 @@ def _deg_rate_env(poa_global, temp, temp_chamber, p, Tf):
         rate of Degradation (NEED TO ADD METRIC)
 
     """
-    return poa_global ** (p) * Tf ** ((temp - temp_chamber) / 10)
+    return _fast_pow(poa_global, p) * Tf ** ((temp - temp_chamber) / 10)
 
 
 def _deg_rate_chamber(I_chamber, p):
@@ -72,30 +106,6 @@ def _deg_rate_chamber(I_chamber, p):
     return chamberdegradationrate
 
 
-def _acceleration_factor(numerator, denominator):
-    """
-    Helper Function. Find the acceleration factor
-
-    (ADD IEEE reference)
-
-    Parameters
-    ----------
-    numerator : float
-        Typically the numerator is the chamber settings
-    denominator : float
-        Typically the TMY data summation
-
-    Returns
-    -------
-    chamberAccelerationFactor : float
-        Acceleration Factor of chamber (NEED TO ADD METRIC)
-    """
-
-    chamberAccelerationFactor = numerator / denominator
-
-    return chamberAccelerationFactor
-
-
 def vantHoff_deg(
     weather_df, meta, I_chamber, temp_chamber, poa=None, temp=None, p=0.5, Tf=1.41
 ):
@@ -124,7 +134,7 @@ def vantHoff_deg(
 
     Returns
     -------
-    accelerationFactor : float or series
+    accelerationFactor : float
         Degradation acceleration factor
 
     """
@@ -142,13 +152,13 @@ def vantHoff_deg(
         poa_global=poa_global, temp=temp, temp_chamber=temp_chamber, p=p, Tf=Tf
     )
     # sumOfDegEnv = rateOfDegEnv.sum(axis = 0, skipna = True)
-    avgOfDegEnv = rateOfDegEnv.mean()
+    avgOfDegEnv = np.nanmean(np.asarray(rateOfDegEnv))
 
     rateOfDegChamber = _deg_rate_chamber(I_chamber, p)
 
-    accelerationFactor = _acceleration_factor(rateOfDegChamber, avgOfDegEnv)
+    accelerationFactor = rateOfDegChamber / avgOfDegEnv
 
-    return accelerationFactor
+    return float(accelerationFactor)
 
 
 def _to_eq_vantHoff(temp, Tf=1.41):
@@ -170,11 +180,11 @@ def _to_eq_vantHoff(temp, Tf=1.41):
     """
 
     toSum = Tf ** (temp / 10)
-    summation = toSum.sum(axis=0, skipna=True)
+    summation = np.nansum(np.asarray(toSum))
 
     Toeq = (10 / np.log(Tf)) * np.log(summation / len(temp))
 
-    return Toeq
+    return float(Toeq)
 
 
 def IwaVantHoff(weather_df, meta, poa=None, temp=None, Teq=None, p=0.5, Tf=1.41):
@@ -220,12 +230,34 @@ def IwaVantHoff(weather_df, meta, poa=None, temp=None, Teq=None, p=0.5, Tf=1.41)
     else:
         poa_global = poa
 
-    toSum = (poa_global**p) * (Tf ** ((temp - Teq) / 10))
-    summation = toSum.sum(axis=0, skipna=True)
+    toSum = _fast_pow(poa_global, p) * (Tf ** ((temp - Teq) / 10))
+    summation = np.nansum(np.asarray(toSum))
 
     Iwa = (summation / len(poa_global)) ** (1 / p)
 
-    return Iwa
+    return float(Iwa)
+
+
+def _arrhenius_exp(temp, Ea):
+    """
+    Helper function. Arrhenius temperature term exp(-Ea / (R * T)).
+
+    Parameters
+    ----------
+    temp : pandas series or float
+        Solar module temperature or Cell temperature [°C]
+    Ea : float
+        Degredation Activation Energy [kJ/mol]
+
+    Returns
+    -------
+    arr_T : pandas series or float
+        Arrhenius temperature term
+    """
+
+    arr_T = np.exp(-(Ea / (0.00831446261815324 * (temp + 273.15))))
+
+    return arr_T
 
 
 def _arrhenius_denominator(poa_global, rh_outdoor, temp, Ea, p, n):
@@ -251,14 +283,21 @@ def _arrhenius_denominator(poa_global, rh_outdoor, temp, Ea, p, n):
 
     Returns
     -------
-    environmentDegradationRate : pandas series
-        Degradation rate of environment
+    environmentDegradationRate : numpy.ndarray
+        Degradation rate of environment, evaluated by numexpr in one fused pass
     """
 
-    environmentDegradationRate = (
-        poa_global ** (p)
-        * rh_outdoor ** (n)
-        * np.exp(-(Ea / (0.00831446261815324 * (temp + 273.15))))
+    environmentDegradationRate = ne.evaluate(
+        "poa_global ** p * rh_outdoor ** n * exp(-(Ea / (R * (temp + 273.15))))",
+        local_dict={
+            "poa_global": np.asarray(poa_global, dtype=np.float64),
+            "rh_outdoor": np.asarray(rh_outdoor, dtype=np.float64),
+            "temp": np.asarray(temp, dtype=np.float64),
+            "Ea": float(Ea),
+            "p": float(p),
+            "n": float(n),
+            "R": 0.00831446261815324,
+        },
     )
 
     return environmentDegradationRate
@@ -291,13 +330,86 @@ def _arrhenius_numerator(I_chamber, rh_chamber, temp_chamber, Ea, p, n):
     """
 
     arrheniusNumerator = (
-        I_chamber ** (p)
-        * rh_chamber ** (n)
-        * np.exp(-(Ea / (0.00831446261815324 * (temp_chamber + 273.15))))
+        I_chamber ** (p) * rh_chamber ** (n) * _arrhenius_exp(temp_chamber, Ea)
     )
     return arrheniusNumerator
 
 
+@lru_cache(maxsize=None)
+def _arrhenius_deg_gufunc():
+    """
+    Helper function. Site-batched Arrhenius acceleration factor.
+
+    Returns
+    -------
+    arrhenius_deg_gufunc : numba.np.ufunc.gufunc.GUFunc
+        Generalized ufunc computing one acceleration factor per site
+    """
+    from numba import guvectorize
+
+    @guvectorize(
+        [
+            "void(float64[:], float64[:], float64[:], float64, float64, float64, "
+            "float64, float64, float64, float64[:])"
+        ],
+        "(t),(t),(t),(),(),(),(),(),()->()",
+        target="parallel",
+    )
+    def arrhenius_deg_gufunc(
+        poa_global, rh_outdoor, temp, I_chamber, rh_chamber, temp_chamber, Ea, p, n, out
+    ):
+        """
+        Helper function. Arrhenius acceleration factor of one site, broadcast by numba
+        over any leading (site) dimensions of the time series. NaN timesteps are
+        skipped in the environment average.
+
+        Parameters
+        ----------
+        poa_global : numpy.ndarray
+            (Global) Plan of Array irradiance [W/m²]
+        rh_outdoor : numpy.ndarray
+            Relative Humidity of material of interest [%]
+        temp : numpy.ndarray
+            Solar module temperature or Cell temperature [°C]
+        I_chamber : float
+            Irradiance of Controlled Condition [W/m²]
+        rh_chamber : float
+            Relative Humidity of Controlled Condition [%]
+        temp_chamber : float
+            Reference temperature [°C] "Chamber Temperature"
+        Ea : float
+            Degredation Activation Energy [kJ/mol]
+        p : float
+            Fit parameter
+        n : float
+            Fit parameter for relative humidity
+        out : numpy.ndarray
+            Degradation acceleration factor
+        """
+        R = 0.00831446261815324
+
+        total = 0.0
+        count = 0
+        for i in range(poa_global.shape[0]):
+            rate = (
+                poa_global[i] ** p
+                * rh_outdoor[i] ** n
+                * np.exp(-Ea / (R * (temp[i] + 273.15)))
+            )
+            if not np.isnan(rate):
+                total += rate
+                count += 1
+
+        numerator = (
+            I_chamber**p
+            * rh_chamber**n
+            * np.exp(-Ea / (R * (temp_chamber + 273.15)))
+        )
+        out[0] = numerator / (total / count)
+
+    return arrhenius_deg_gufunc
+
+
 def arrhenius_deg(
     weather_df,
     meta,
@@ -322,11 +434,14 @@ def arrhenius_deg(
         Dataframe containing at least dni, dhi, ghi, temperature, wind_speed
     meta : dict
         Location meta-data containing at least latitude, longitude, altitude
-    rh_outdoor : float series
+    rh_outdoor : float series or numpy.ndarray
         Relative Humidity of material of interest
         Acceptable relative humiditys can be calculated
         from these functions: rh_backsheet(), rh_back_encap(), rh_front_encap(),
         rh_surface_outside()
+        A 2-D array of shape (sites, time) computes the acceleration factor of
+        every site in a single compiled kernel. poa and temp are then broadcast
+        against it and may be 1-D or (sites, time).
     I_chamber : float
         Irradiance of Controlled Condition [W/m²]
     rh_chamber : float
@@ -351,8 +466,8 @@ def arrhenius_deg(
 
     Returns
     --------
-    accelerationFactor : pandas series
-        Degradation acceleration factor
+    accelerationFactor : float or numpy.ndarray
+        Degradation acceleration factor. One value per site for 2-D rh_outdoor.
 
     """
 
@@ -367,11 +482,24 @@ def arrhenius_deg(
     else:
         poa_global = poa
 
+    if np.ndim(rh_outdoor) == 2:
+        return _arrhenius_deg_gufunc()(
+            np.asarray(poa_global, dtype=np.float64),
+            np.asarray(rh_outdoor, dtype=np.float64),
+            np.asarray(temp, dtype=np.float64),
+            I_chamber,
+            rh_chamber,
+            temp_chamber,
+            Ea,
+            p,
+            n,
+        )
+
     arrheniusDenominator = _arrhenius_denominator(
         poa_global=poa_global, rh_outdoor=rh_outdoor, temp=temp, Ea=Ea, p=p, n=n
     )
 
-    AvgOfDenominator = arrheniusDenominator.mean()
+    AvgOfDenominator = np.nanmean(arrheniusDenominator)
 
     arrheniusNumerator = _arrhenius_numerator(
         I_chamber=I_chamber,
@@ -382,12 +510,12 @@ def arrhenius_deg(
         n=n,
     )
 
-    accelerationFactor = _acceleration_factor(arrheniusNumerator, AvgOfDenominator)
+    accelerationFactor = arrheniusNumerator / AvgOfDenominator
 
-    return accelerationFactor
+    return float(accelerationFactor)
 
 
-def _T_eq_arrhenius(temp, Ea):
+def _T_eq_arrhenius(temp, Ea, arr_T=None):
     """
     Get the Temperature equivalent required for the settings of the controlled environment
     Calculation is used in determining Arrhenius Environmental Characterization
@@ -398,6 +526,8 @@ def _T_eq_arrhenius(temp, Ea):
         Solar module temperature or Cell temperature [°C]
     Ea : float
         Degredation Activation Energy [kJ/mol]
+    arr_T : pandas series, optional
+        Precomputed Arrhenius temperature term of temp, see _arrhenius_exp
 
     Returns
     -------
@@ -407,16 +537,19 @@ def _T_eq_arrhenius(temp, Ea):
 
     """
 
-    summationFrame = np.exp(-(Ea / (0.00831446261815324 * (temp + 273.15))))
-    sumForTeq = summationFrame.sum(axis=0, skipna=True)
+    if arr_T is None:
+        arr_T = _arrhenius_exp(temp, Ea)
+
+    summationFrame = arr_T
+    sumForTeq = np.nansum(np.asarray(summationFrame))
     Teq = -((Ea) / (0.00831446261815324 * np.log(sumForTeq / len(temp))))
     # Convert to celsius
     Teq = Teq - 273.15
 
-    return Teq
+    return float(Teq)
 
 
-def _RH_wa_arrhenius(rh_outdoor, temp, Ea, Teq=None, n=1):
+def _RH_wa_arrhenius(rh_outdoor, temp, Ea, Teq=None, n=1, arr_T=None):
     """
     NOTE
 
@@ -437,6 +570,8 @@ def _RH_wa_arrhenius(rh_outdoor, temp, Ea, Teq=None, n=1):
         Equivalent Arrhenius temperature [°C]
     n : float
         Fit parameter for relative humidity
+    arr_T : pandas series, optional
+        Precomputed Arrhenius temperature term of temp, see _arrhenius_exp
 
     Returns
     --------
@@ -445,19 +580,17 @@ def _RH_wa_arrhenius(rh_outdoor, temp, Ea, Teq=None, n=1):
 
     """
 
+    if arr_T is None:
+        arr_T = _arrhenius_exp(temp, Ea)
+
     if Teq is None:
-        Teq = _T_eq_arrhenius(temp, Ea)
+        Teq = _T_eq_arrhenius(temp, Ea, arr_T=arr_T)
 
-    summationFrame = (rh_outdoor**n) * np.exp(
-        -(Ea / (0.00831446261815324 * (temp + 273.15)))
-    )
-    sumForRHwa = summationFrame.sum(axis=0, skipna=True)
-    RHwa = (
-        sumForRHwa
-        / (len(summationFrame) * np.exp(-(Ea / (0.00831446261815324 * (Teq + 273.15)))))
-    ) ** (1 / n)
+    summationFrame = _fast_pow(rh_outdoor, n) * arr_T
+    sumForRHwa = np.nansum(np.asarray(summationFrame))
+    RHwa = (sumForRHwa / (len(summationFrame) * _arrhenius_exp(Teq, Ea))) ** (1 / n)
 
-    return RHwa
+    return float(RHwa)
 
 
 # TODO:   CHECK
@@ -516,33 +649,28 @@ def IwaArrhenius(
     if temp is None:
         temp = temperature.cell(weather_df, meta, poa)
 
+    # the Arrhenius temperature term is shared by Teq, RHwa and the numerator
+    arr_T = _arrhenius_exp(temp, Ea)
+
     if Teq is None:
-        Teq = _T_eq_arrhenius(temp, Ea)
+        Teq = _T_eq_arrhenius(temp, Ea, arr_T=arr_T)
 
     if RHwa is None:
-        RHwa = _RH_wa_arrhenius(rh_outdoor, temp, Ea)
+        RHwa = _RH_wa_arrhenius(rh_outdoor, temp, Ea, arr_T=arr_T)
 
     if isinstance(poa, pd.DataFrame):
         poa_global = poa["poa_global"]
     else:
         poa_global = poa
 
-    numerator = (
-        poa_global ** (p)
-        * rh_outdoor ** (n)
-        * np.exp(-(Ea / (0.00831446261815324 * (temp + 273.15))))
-    )
-    sumOfNumerator = numerator.sum(axis=0, skipna=True)
+    numerator = _fast_pow(poa_global, p) * _fast_pow(rh_outdoor, n) * arr_T
+    sumOfNumerator = np.nansum(np.asarray(numerator))
 
-    denominator = (
-        (len(numerator))
-        * ((RHwa) ** n)
-        * (np.exp(-(Ea / (0.00831446261815324 * (Teq + 273.15)))))
-    )
+    denominator = (len(numerator)) * ((RHwa) ** n) * _arrhenius_exp(Teq, Ea)
 
     IWa = (sumOfNumerator / denominator) ** (1 / p)
 
-    return IWa
+    return float(IWa)
 
 
 ############
@@ -550,96 +678,28 @@ def IwaArrhenius(
 ############
 
 
-def _rh_Above85(rh):
-    """
-    Helper function. Determines if the relative humidity is above 85%.
-
-    Parameters
-    ----------
-    rh : float
-        Relative Humidity %
-
-    Returns
-    --------
-    rhabove85 : boolean
-        True if the relative humidity is above 85% or False if the relative
-        humidity is below 85%
-
-    """
-
-    if rh > 85:
-        rhabove85 = True
-
-    else:
-        rhabove85 = False
-
-    return rhabove85
-
-
 def _hoursRH_Above85(df):
     """
     Helper Function. Count the number of hours relative humidity is above 85%.
 
     Parameters
     ----------
-    df : dataframe
-        DataFrame, dataframe containing Relative Humidity %
-
-    Returns
-    -------
-    numhoursabove85 : int
-        Number of hours relative humidity is above 85%
-
-    """
-    booleanDf = df.apply(lambda x: _rh_Above85(x))
-    numhoursabove85 = booleanDf.sum()
-
-    return numhoursabove85
-
-
-def _whToGJ(wh):
-    """
-    NOTE: unused, remove?
-
-    Helper Function to convert Wh/m² to GJ/m²
-
-    Parameters
-    -----------
-    wh : float
-        Input Value in Wh/m²
+    df : pd.DataFrame, pd.Series or np.ndarray
+        Relative Humidity %
 
     Returns
     -------
-    gj : float
-        Value in GJ/m²
+    numhoursabove85 : int or pd.Series
+        Number of hours relative humidity is above 85%. One count per column if df
+        is a DataFrame.
 
     """
+    if isinstance(df, pd.DataFrame):
+        return (df > 85).sum(axis=0)
 
-    gj = 0.0000036 * wh
-
-    return gj
-
-
-def _gJtoMJ(gJ):
-    """
-    NOTE: unused, remove?
-
-    Helper Function to convert GJ/m² to MJ/y
-
-    Parameters
-    -----------
-    gJ : float
-        Value in GJ/m^-2
-
-    Returns
-    -------
-    MJ : float
-        Value in MJ/m^-2
+    numhoursabove85 = int((np.asarray(df) > 85).sum())
 
-    """
-    MJ = gJ * 1000
-
-    return MJ
+    return numhoursabove85
 
 
 def degradation(
@@ -652,11 +712,13 @@ def degradation(
 
     Parameters
     ----------
-    spectra : pd.Series type=Float
-        front or rear irradiance at each wavelength in "wavelengths" [W/m^2 nm]
-    rh_module : pd.Series type=Float
+    spectra : pd.Series, np.ndarray or xr.DataArray type=Float
+        front or rear irradiance at each wavelength in "wavelengths" [W/m^2 nm].
+        Either a time indexed series of per-timestep sequences (or bracketed
+        strings), or a 2-D array of shape (time, wavelength) which is used as is.
+    rh_module : pd.Series or np.ndarray type=Float
         module RH, time indexed [%]
-    temp_module : pd.Series type=Float
+    temp_module : pd.Series or np.ndarray type=Float
         module temperature, time indexed [C]
     wavelengths : int-array
         integer array (or list) of wavelengths tested w/ uniform delta
@@ -690,42 +752,265 @@ def degradation(
     # Constants
     R = 0.0083145  # Gas Constant in [kJ/mol*K]
 
-    wav_bin = list(np.diff(wavelengths))
-    wav_bin.append(wav_bin[-1])  # Adding a bin for the last wavelength
+    wavelengths = np.asarray(wavelengths, dtype=np.float64)
+    wav_bin = np.diff(wavelengths)
 
     # Integral over Wavelength
-    try:
-        irr = pd.DataFrame(spectra.tolist(), index=spectra.index)
-        irr.columns = wavelengths
-    except:
-        # TODO: Fix this except it works on some cases, veto it by cases
+    # The spectral terms are unpacked into float32 to halve the memory traffic of
+    # the (time, wavelength) matrix. A 2-D spectra array is used in the caller's
+    # float precision without a copy. The Arrhenius term stays in float64 as
+    # exp(-Ea / (R * T)) underflows single precision.
+    # spectra is either a (time, wavelength) array or holds one sequence or one
+    # bracketed string per timestep
+    if np.ndim(spectra) == 2:
+        irr = np.asarray(spectra)
+        if irr.dtype not in (np.float32, np.float64):
+            irr = irr.astype(np.float64)
+    elif isinstance(spectra.iat[0], str):
         print("Removing brackets from spectral irradiance data")
-        # irr = data['spectra'].str.strip('[]').str.split(',', expand=True).astype(float)
-        irr = spectra.str.strip("[]").str.split(",", expand=True).astype(float)
-        irr.columns = wavelengths
-
-    sensitivitywavelengths = np.exp(-C2 * wavelengths)
-    irr = irr * sensitivitywavelengths
-    irr *= np.array(wav_bin)
-    irr = irr**p
-    data = pd.DataFrame(index=spectra.index)
-    data["G_integral"] = irr.sum(axis=1)
+        irr = np.asarray(
+            [np.fromstring(s.strip("[]"), sep=",") for s in spectra.to_numpy()],
+            dtype=np.float32,
+        )
+    else:
+        irr = np.asarray(spectra.to_numpy().tolist(), dtype=np.float32)
+
+    # wavelength sensitivity and bin width only depend on wavelength. They are
+    # raised to p here, as (irr * kernel)^p = irr^p * kernel^p for non-negative
+    # irradiance.
+    if np.allclose(wav_bin, wav_bin[0]):
+        # uniform delta, the bin width is a single scalar factor
+        kernel = np.exp(-C2 * p * wavelengths) * wav_bin[0] ** p
+    else:
+        # Adding a bin for the last wavelength
+        wav_bin = np.append(wav_bin, wav_bin[-1])
+        kernel = _fast_pow(np.exp(-C2 * wavelengths) * wav_bin, p)
+    kernel = kernel.astype(irr.dtype)
 
+    # Arrhenius integrand exp(-Ea / (R * T)) * RH^n, built in place
     EApR = -Ea / R
-    C4 = np.exp(EApR / temp_module)
+    arr_integrand = np.array(temp_module, dtype=np.float64)
+    np.reciprocal(arr_integrand, out=arr_integrand)
+    arr_integrand *= EApR
+    np.exp(arr_integrand, out=arr_integrand)
+    arr_integrand *= _fast_pow(np.asarray(rh_module, dtype=np.float64), n)
+
+    degradation = C * _degradation_kernel()(
+        np.ascontiguousarray(irr), kernel, arr_integrand, p
+    )
+
+    return degradation
+
 
-    RHn = rh_module**n
-    data["Arr_integrand"] = C4 * RHn
+def degradation_batch(
+    spectra,
+    rh_module,
+    temp_module,
+    wavelengths,
+    Ea=40.0,
+    n=1.0,
+    p=0.5,
+    C2=0.07,
+    C=1.0,
+    n_workers=None,
+):
+    """
+    Compute the spectral degradation of many sites in parallel processes.
+    The spectra are placed in shared memory once, so worker processes read
+    them in place instead of receiving a pickled copy.
+
+    Parameters
+    ----------
+    spectra : np.ndarray type=Float
+        front or rear irradiance, shape (site, time, wavelength) [W/m^2 nm]
+    rh_module : np.ndarray type=Float
+        module RH, shape (site, time) [%]
+    temp_module : np.ndarray type=Float
+        module temperature, shape (site, time) [C]
+    wavelengths : int-array
+        integer array (or list) of wavelengths tested w/ uniform delta
+        in nanometers [nm]
+    Ea : float
+        Arrhenius activation energy. The default is 40. [kJ/mol]
+    n : float
+        Fit paramter for RH sensitivity. The default is 1.
+    p : float
+        Fit parameter for irradiance sensitivity. Typically
+        0.6 +- 0.22
+    C2 : float
+        Fit parameter for sensitivity to wavelength exponential.
+        Typically 0.07
+    C : float
+        Fit parameter for the Degradation equaiton
+        Typically 1.0
+    n_workers : int, optional
+        Number of worker processes. Defaults to the number of processors.
 
-    data["dD"] = data["G_integral"] * data["Arr_integrand"]
+    Returns
+    -------
+    degradation : np.ndarray
+        Total degredation factor over time and wavelength for each site.
 
-    degradation = C * data["dD"].sum(axis=0)
+    """
+    shape = np.shape(spectra)
+    dtype = np.dtype(np.float32)
+    rh_module = np.asarray(rh_module, dtype=np.float64)
+    temp_module = np.asarray(temp_module, dtype=np.float64)
+
+    degradation = np.empty(shape[0])
+    if shape[0] == 0:
+        return degradation
+
+    # the float32 copy is written straight into the shared block
+    shm = shared_memory.SharedMemory(
+        create=True, size=int(np.prod(shape)) * dtype.itemsize
+    )
+    try:
+        shared = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        np.copyto(shared, spectra, casting="same_kind")
+        del shared
+
+        # numba's thread pool may already be running in this process, and
+        # forking it deadlocks the children, so workers are spawned instead.
+        # Each worker runs the parallel kernel on one thread, the processes
+        # already cover the cores.
+        with ProcessPoolExecutor(
+            max_workers=n_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=utilities._single_numba_thread,
+        ) as executor:
+            futures = {
+                executor.submit(
+                    _degradation_site,
+                    shm.name,
+                    shape,
+                    dtype.str,
+                    site,
+                    rh_module[site],
+                    temp_module[site],
+                    wavelengths,
+                    Ea,
+                    n,
+                    p,
+                    C2,
+                    C,
+                ): site
+                for site in range(shape[0])
+            }
+            for future in as_completed(futures):
+                degradation[futures[future]] = future.result()
+    finally:
+        shm.close()
+        shm.unlink()
 
     return degradation
 
 
+def _degradation_site(
+    shm_name, shape, dtype, site, rh_module, temp_module, wavelengths, Ea, n, p, C2, C
+):
+    """
+    Helper function. Worker for degradation_batch, computes the degradation of a
+    single site from the spectra held in shared memory.
+
+    Parameters
+    ----------
+    shm_name : str
+        Name of the shared memory block holding the spectra
+    shape : tuple
+        Shape of the spectra, (site, time, wavelength)
+    dtype : str
+        Data type of the spectra
+    site : int
+        Index of the site to compute
+    rh_module, temp_module, wavelengths, Ea, n, p, C2, C :
+        See degradation
+
+    Returns
+    -------
+    degradation : float
+        Total degredation factor over time and wavelength.
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    spectra = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+    res = degradation(
+        spectra[site],
+        rh_module,
+        temp_module,
+        wavelengths,
+        Ea=Ea,
+        n=n,
+        p=p,
+        C2=C2,
+        C=C,
+    )
+
+    del spectra
+    shm.close()
+
+    return res
+
+
+@lru_cache(maxsize=None)
+def _degradation_kernel():
+    """
+    Helper function. Double integral of degradation over wavelength and time.
+
+    Returns
+    -------
+    degradation_kernel : numba.core.registry.CPUDispatcher
+        Compiled double integral over wavelength and time
+    """
+    from numba import njit, prange
+
+    # no "nnan" fast-math flag, the NaN checks below must not be folded away
+    @njit(parallel=True, fastmath={"reassoc", "contract"}, cache=True)
+    def degradation_kernel(irr, kernel, arr_integrand, p):
+        """
+        Helper function. Double integral of the spectral and Arrhenius terms over
+        wavelength and time. NaN terms are skipped, as in a pandas sum.
+
+        Parameters
+        ----------
+        irr : numpy.ndarray
+            Spectral irradiance, shape (time, wavelength) [W/m^2 nm]. The wavelength
+            sums are accumulated in float64 regardless of the input precision.
+        kernel : numpy.ndarray
+            Wavelength sensitivity multiplied by the wavelength bin width, raised
+            to the power p
+        arr_integrand : numpy.ndarray
+            Arrhenius and relative humidity term at each timestep
+        p : float
+            Fit parameter for irradiance sensitivity
+
+        Returns
+        -------
+        total : float
+            Sum of the degradation integrand over wavelength and time
+        """
+        n_times, n_wavelengths = irr.shape
+
+        total = 0.0
+        for t in prange(n_times):
+            G_integral = 0.0
+            for w in range(n_wavelengths):
+                if p == 0.5:
+                    G = np.sqrt(irr[t, w]) * kernel[w]
+                else:
+                    G = irr[t, w] ** p * kernel[w]
+                if not np.isnan(G):
+                    G_integral += G
+            dD = G_integral * arr_integrand[t]
+            if not np.isnan(dD):
+                total += dD
+
+        return total
+
+    return degradation_kernel
+
+
 # change it to take pd.DataFrame? instead of np.ndarray
-@njit
 def vecArrhenius(
     poa_global: np.ndarray, module_temp: np.ndarray, ea: float, x: float, lnr0: float
 ) -> float:
@@ -756,21 +1041,40 @@ def vecArrhenius(
 
     """
 
-    mask = poa_global >= 25
-    poa_global = poa_global[mask]
-    module_temp = module_temp[mask]
+    return _vec_arrhenius_kernel()(poa_global, module_temp, ea, x, lnr0)
 
-    ea_scaled = ea / 8.31446261815324e-03
-    R0 = np.exp(lnr0)
-    poa_global_scaled = poa_global / 1000
 
-    degredation = 0
-    # refactor to list comprehension approach
-    for entry in range(len(poa_global_scaled)):
-        degredation += (
-            R0
-            * np.exp(-ea_scaled / (273.15 + module_temp[entry]))
-            * np.power(poa_global_scaled[entry], x)
-        )
+@lru_cache(maxsize=None)
+def _vec_arrhenius_kernel():
+    """
+    Helper function. Per-layer Arrhenius degradation loop of vecArrhenius.
 
-    return degredation / len(poa_global)
+    Returns
+    -------
+    vec_arrhenius_kernel : numba.core.registry.CPUDispatcher
+        Compiled vecArrhenius
+    """
+    from numba import njit
+
+    @njit
+    def vec_arrhenius_kernel(poa_global, module_temp, ea, x, lnr0):
+        mask = poa_global >= 25
+        poa_global = poa_global[mask]
+        module_temp = module_temp[mask]
+
+        ea_scaled = ea / 8.31446261815324e-03
+        R0 = np.exp(lnr0)
+        poa_global_scaled = poa_global / 1000
+
+        degredation = 0
+        # refactor to list comprehension approach
+        for entry in range(len(poa_global_scaled)):
+            degredation += (
+                R0
+                * np.exp(-ea_scaled / (273.15 + module_temp[entry]))
+                * np.power(poa_global_scaled[entry], x)
+            )
+
+        return degredation / len(poa_global)
+
+    return vec_arrhenius_kernel
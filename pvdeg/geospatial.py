@@ -8,8 +8,10 @@ from . import letid
 
 import xarray as xr
 import dask.array as da
+import numpy as np
 import pandas as pd
-from dask.distributed import Client, LocalCluster
+from dask.distributed import Client, LocalCluster, get_client
+from concurrent.futures import ThreadPoolExecutor
 
 import matplotlib.pyplot as plt
 import cartopy.crs as ccrs
@@ -85,7 +87,7 @@ def calc_gid(ds_gid, meta_gid, func, **kwargs):
     Parameters
     ----------
     ds_gid : xarray.Dataset
-        Dataset containing weather data for a single gid.
+        Dataset containing weather data for a single gid, indexed by time.
     meta_gid : dict
         Dictionary containing meta data for a single gid.
     func : function
@@ -99,17 +101,33 @@ def calc_gid(ds_gid, meta_gid, func, **kwargs):
         Dataset with results for a single gid.
     """
 
-    df_weather = ds_gid.to_dataframe()
+    # build the frame from the arrays directly, to_dataframe goes through a
+    # MultiIndex and copies every column
+    df_weather = pd.DataFrame(
+        {var: ds_gid[var].values for var in ds_gid.data_vars},
+        index=ds_gid.indexes["time"],
+        copy=False,
+    )
     df_res = func(weather_df=df_weather, meta=meta_gid, **kwargs)
-    ds_res = xr.Dataset.from_dataframe(df_res)
-
-    if not df_res.index.name:
-        ds_res = ds_res.isel(index=0, drop=True)
+    # build the dataset directly for the usual single index results,
+    # from_dataframe goes through the general MultiIndex path
+    if isinstance(df_res.index, pd.MultiIndex):
+        ds_res = xr.Dataset.from_dataframe(df_res)
+    elif df_res.index.name:
+        dim = df_res.index.name
+        ds_res = xr.Dataset(
+            data_vars={col: (dim, df_res[col].to_numpy()) for col in df_res.columns},
+            coords={dim: df_res.index},
+        )
+    else:
+        ds_res = xr.Dataset(
+            data_vars={col: ((), df_res[col].iloc[0]) for col in df_res.columns}
+        )
 
     return ds_res
 
 
-def calc_block(weather_ds_block, future_meta_df, func, func_kwargs):
+def calc_block(weather_ds_block, future_meta_df, func, func_kwargs, n_jobs=1):
     """
     Calculates a block of gids for a given function.
 
@@ -123,6 +141,9 @@ def calc_block(weather_ds_block, future_meta_df, func, func_kwargs):
         Function to apply to weather data.
     func_kwargs : dict
         Keyword arguments to pass to func.
+    n_jobs : int
+        Number of threads computing the gids of the block. Only useful if func
+        releases the GIL, and if the dask workers have spare cores.
 
     Returns
     -------
@@ -130,18 +151,36 @@ def calc_block(weather_ds_block, future_meta_df, func, func_kwargs):
         Dataset with results for a block of gids.
     """
 
-    res = weather_ds_block.groupby("gid", squeeze=False).map(
-        lambda ds_gid: calc_gid(
-            ds_gid=ds_gid.squeeze(),
-            meta_gid=future_meta_df.loc[ds_gid["gid"].values[0]].to_dict(),
+    # plain loop over the gid axis, groupby builds a new object per group
+    gids = weather_ds_block["gid"]
+    # one dict per gid of the block, built in a single pandas call
+    meta_block = future_meta_df.loc[gids.values].to_dict(orient="records")
+
+    def _calc_gid(i):
+        return calc_gid(
+            ds_gid=weather_ds_block.isel(gid=i),
+            meta_gid=meta_block[i],
             func=func,
             **func_kwargs,
         )
+
+    if n_jobs > 1:
+        with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+            results = list(executor.map(_calc_gid, range(gids.size)))
+    else:
+        results = [_calc_gid(i) for i in range(gids.size)]
+
+    res = xr.concat(
+        results,
+        dim=gids,
+        coords="minimal",
+        compat="override",
+        join="override",
     )
     return res
 
 
-def analysis(weather_ds, meta_df, func, template=None, **func_kwargs):
+def analysis(weather_ds, meta_df, func, template=None, n_jobs=1, **func_kwargs):
     """
     Applies a function to each gid of a weather dataset.
 
@@ -155,6 +194,10 @@ def analysis(weather_ds, meta_df, func, template=None, **func_kwargs):
         Function to apply to weather data.
     template : xarray.Dataset
         Template for output data.
+    n_jobs : int
+        Number of threads computing the gids within each dask block. Keep the
+        default of 1 unless func releases the GIL and the workers have spare
+        cores, otherwise the threads only oversubscribe the workers.
     func_kwargs : dict
         Keyword arguments to pass to func.
 
@@ -168,8 +211,25 @@ def analysis(weather_ds, meta_df, func, template=None, **func_kwargs):
         param = template_parameters(func)
         template = output_template(weather_ds, **param)
 
-    # future_meta_df = client.scatter(meta_df)
-    kwargs = {"func": func, "future_meta_df": meta_df, "func_kwargs": func_kwargs}
+    # match the weather chunks to the template, so each block maps onto one
+    # template block without a rechunk at compute time
+    weather_ds = weather_ds.chunk(
+        {d: template.chunks[d] for d in template.chunks if d in weather_ds.dims}
+    )
+
+    # With a distributed client, send meta_df to the workers once instead of
+    # embedding a copy of it in every task of the graph.
+    try:
+        future_meta_df = get_client().scatter(meta_df, broadcast=True, hash=False)
+    except ValueError:
+        future_meta_df = meta_df
+
+    kwargs = {
+        "func": func,
+        "future_meta_df": future_meta_df,
+        "func_kwargs": func_kwargs,
+        "n_jobs": n_jobs,
+    }
 
     stacked = weather_ds.map_blocks(
         calc_block, kwargs=kwargs, template=template
@@ -177,19 +237,124 @@ def analysis(weather_ds, meta_df, func, template=None, **func_kwargs):
 
     # lats = stacked.latitude.values.flatten()
     # lons = stacked.longitude.values.flatten()
-    stacked = stacked.drop(["gid"])
+    stacked = stacked.drop_vars(["gid"], errors="ignore")
     # stacked = stacked.drop_vars(['latitude', 'longitude'])
-    # stacked.coords["gid"] = pd.MultiIndex.from_arrays(
-    #     [meta_df["latitude"], meta_df["longitude"]], names=["latitude", "longitude"]
-    # )
-    mindex_obj = pd.MultiIndex.from_arrays(
-        [meta_df["latitude"], meta_df["longitude"]], names=["latitude", "longitude"]
+
+    res = _grid_gids(stacked, meta_df)
+    return res
+
+
+def analysis_ufunc(
+    weather_ds,
+    meta_df,
+    kernel,
+    input_vars,
+    output_vars,
+    output_dtypes=None,
+    **kernel_kwargs,
+):
+    """
+    Applies a NumPy function to the weather time series of all gids at once.
+    Unlike analysis, the function works on whole arrays instead of one gid at
+    a time, so dask maps it over the blocks of weather_ds directly.
+
+    Parameters
+    ----------
+    weather_ds : xarray.Dataset
+        Dataset containing weather data for a block of gids.
+    meta_df : pandas.DataFrame
+        DataFrame containing meta data for a block of gids.
+    kernel : function
+        Function taking one array per input variable, with time as the last
+        axis, and returning one array of the same shape per output variable.
+    input_vars : list(str)
+        Names of the weather_ds variables passed to kernel, in order.
+    output_vars : list(str)
+        Names of the variables returned by kernel, in order.
+    output_dtypes : list, optional
+        Data types of the returned variables. The default is float64.
+    kernel_kwargs : dict
+        Keyword arguments to pass to kernel.
+
+    Returns
+    -------
+    ds_res : xarray.Dataset
+        Dataset with results for a block of gids.
+    """
+
+    if output_dtypes is None:
+        output_dtypes = [np.float64] * len(output_vars)
+
+    res = xr.apply_ufunc(
+        kernel,
+        *[weather_ds[var] for var in input_vars],
+        input_core_dims=[["time"]] * len(input_vars),
+        output_core_dims=[["time"]] * len(output_vars),
+        dask="parallelized",
+        output_dtypes=output_dtypes,
+        kwargs=kernel_kwargs,
     )
-    mindex_coords = xr.Coordinates.from_pandas_multiindex(mindex_obj, "gid")
-    stacked = stacked.assign_coords(mindex_coords)
+    if len(output_vars) == 1:
+        res = (res,)
+
+    stacked = xr.Dataset(dict(zip(output_vars, res))).compute()
+    stacked = stacked.drop_vars(["gid"], errors="ignore")
+
+    res = _grid_gids(stacked, meta_df)
+    return res
+
+
+def _grid_gids(stacked, meta_df):
+    """
+    Helper function. Places results along the gid dimension onto a latitude,
+    longitude grid.
+
+    Parameters
+    ----------
+    stacked : xarray.Dataset
+        Dataset with results along the gid dimension, in the order of meta_df.
+    meta_df : pandas.DataFrame
+        DataFrame containing the latitude and longitude of each gid.
+
+    Returns
+    -------
+    res : xarray.Dataset
+        Dataset with results on the latitude, longitude grid.
+    """
 
-    stacked = stacked.drop_duplicates("gid")
-    res = stacked.unstack("gid")  # , sparse=True
+    # Scatter the gids onto the (latitude, longitude) grid with plain array
+    # indexing. Assigning a MultiIndex and unstacking in xarray is much slower.
+    latitude, lat_idx = np.unique(meta_df["latitude"], return_inverse=True)
+    longitude, lon_idx = np.unique(meta_df["longitude"], return_inverse=True)
+
+    # keep the first gid of repeated (latitude, longitude) pairs
+    cell = lat_idx * longitude.size + lon_idx
+    first = np.unique(cell, return_index=True)[1]
+    lat_idx, lon_idx = lat_idx[first], lon_idx[first]
+    full = lat_idx.size == latitude.size * longitude.size
+
+    data_vars = {}
+    for var, values in stacked.data_vars.items():
+        dims = [d for d in values.dims if d != "gid"]
+        values = values.transpose(*dims, "gid").values[..., first]
+        shape = values.shape[:-1] + (latitude.size, longitude.size)
+        if full:
+            grid = np.empty(shape, dtype=values.dtype)
+        else:
+            dtype = np.result_type(values.dtype, np.float32)
+            grid = np.full(shape, np.nan, dtype=dtype)
+        grid[..., lat_idx, lon_idx] = values
+        data_vars[var] = ((*dims, "latitude", "longitude"), grid, stacked[var].attrs)
+
+    res = xr.Dataset(
+        data_vars=data_vars,
+        coords={
+            "latitude": latitude,
+            "longitude": longitude,
+            **{c: v for c, v in stacked.coords.items() if "gid" not in v.dims},
+        },
+        attrs=stacked.attrs,
+    )
     return res
 
 
@@ -218,45 +383,39 @@ def output_template(
     output_template : xarray.Dataset
         Template for output data.
     """
-    dims = set([d for dim in shapes.values() for d in dim])
-    dims_size = dict(ds_gids.sizes) | add_dims
+    dims = {d for dim in shapes.values() for d in dim}
+    dims_size = {d: add_dims[d] if d in add_dims else ds_gids.sizes[d] for d in dims}
+
+    # the arrays are created with the input chunks, so there is no rechunk step
+    # in the graph
+    chunks = {d: ds_gids.chunks.get(d, dims_size[d]) for d in dims}
 
     output_template = xr.Dataset(
         data_vars={
-            var: (dim, da.empty([dims_size[d] for d in dim]), attrs.get(var))
+            var: (
+                dim,
+                da.empty([dims_size[d] for d in dim], chunks=[chunks[d] for d in dim]),
+                attrs.get(var),
+            )
             for var, dim in shapes.items()
         },
         coords={dim: ds_gids[dim] for dim in dims},
         attrs=global_attrs,
-    ).chunk({dim: ds_gids.chunks[dim] for dim in dims})
+    )
 
     return output_template
 
 
-def template_parameters(func):
-    """
-    Output parameters for xarray template.
-
-    Returns
-    -------
-    shapes : dict
-        Dictionary of variable names and their associated dimensions.
-    attrs : dict
-        Dictionary of attributes for each variable (e.g. units).
-    global_attrs: dict
-        Dictionary of global attributes for the output template.
-    add_dims : dict
-        Dictionary of dimensions to add to the output template.
-    """
-
-    if func == standards.standoff:
-        shapes = {
+# Output template parameters of the functions with a preset template. Further
+# functions can be registered by adding an entry.
+_TEMPLATE_REGISTRY = {
+    standards.standoff: {
+        "shapes": {
             "x": ("gid",),
             "T98_inf": ("gid",),
             "T98_0": ("gid",),
-        }
-
-        attrs = {
+        },
+        "attrs": {
             "x": {"long_name": "Standoff distance", "units": "cm"},
             "T98_0": {
                 "long_name": "98th percential temperature of a theoretical module with no standoff",
@@ -266,30 +425,25 @@ def template_parameters(func):
                 "long_name": "98th percential temperature of a theoretical rack mounted module",
                 "units": "Celsius",
             },
-        }
-
-        global_attrs = {
+        },
+        "global_attrs": {
             "long_name": "Standoff dataset",
-        }
-
-        add_dims = {}
-
-    elif func == humidity.module:
-        shapes = {
+        },
+        "add_dims": {},
+    },
+    humidity.module: {
+        "shapes": {
             "RH_surface_outside": ("gid", "time"),
             "RH_front_encap": ("gid", "time"),
             "RH_back_encap": ("gid", "time"),
             "RH_backsheet": ("gid", "time"),
-        }
-
-        attrs = {}
-
-        global_attrs = {}
-
-        add_dims = {}
-
-    elif func == letid.calc_letid_outdoors:
-        shapes = {
+        },
+        "attrs": {},
+        "global_attrs": {},
+        "add_dims": {},
+    },
+    letid.calc_letid_outdoors: {
+        "shapes": {
             "Temperature": ("gid", "time"),
             "Injection": ("gid", "time"),
             "NA": ("gid", "time"),
@@ -302,25 +456,36 @@ def template_parameters(func):
             "FF": ("gid", "time"),
             "Pmp": ("gid", "time"),
             "Pmp_norm": ("gid", "time"),
-        }
+        },
+        "attrs": {},
+        "global_attrs": {},
+        "add_dims": {},
+    },
+}
 
-        attrs = {}
 
-        global_attrs = {}
+def template_parameters(func):
+    """
+    Output parameters for xarray template.
 
-        add_dims = {}
+    Returns
+    -------
+    shapes : dict
+        Dictionary of variable names and their associated dimensions.
+    attrs : dict
+        Dictionary of attributes for each variable (e.g. units).
+    global_attrs: dict
+        Dictionary of global attributes for the output template.
+    add_dims : dict
+        Dictionary of dimensions to add to the output template.
+    """
 
-    else:
+    try:
+        parameters = _TEMPLATE_REGISTRY[func]
+    except KeyError:
         raise ValueError(f"No preset output template for function {func}.")
 
-    parameters = {
-        "shapes": shapes,
-        "attrs": attrs,
-        "global_attrs": global_attrs,
-        "add_dims": add_dims,
-    }
-
-    return parameters
+    return dict(parameters)
 
 
 def plot_USA(
@@ -2,13 +2,171 @@
 """
 from datetime import date
 from datetime import datetime as dt
+import copy
 import os
+import shutil
+import sys
 from pvdeg import utilities as utils
 import pvdeg
 import json
+import hashlib
+import numpy as np
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+from inspect import signature
+from types import MappingProxyType
 
 # TODO: add functions...
 
+# parsed scenario files, keyed by path, with the (mtime, size) they were read at
+_CFG_CACHE = {}
+
+
+def _load_scenario_json(file_path):
+    """
+    Helper function. Read a scenario .json file. The parsed contents are cached
+    and reused until the file's modification time or size changes.
+
+    Parameters
+    ----------
+    file_path : (str, pathObj)
+        File path to the scenario .json file
+
+    Returns
+    -------
+    data : dict
+        parsed scenario dictionary, a copy owned by the caller
+    """
+    st = os.stat(file_path)
+    key = (st.st_mtime_ns, st.st_size)
+
+    hit = _CFG_CACHE.get(file_path)
+    if hit is not None and hit[0] == key:
+        return copy.deepcopy(hit[1])
+
+    with open(file_path, "rb") as f:
+        data = json.load(f)
+    # files exported before the keys matched the Scenario attributes
+    for old_key, new_key in (("gid_file", "gids"), ("test_modules", "modules")):
+        if old_key in data:
+            data.setdefault(new_key, data.pop(old_key))
+    _CFG_CACHE[file_path] = (key, data)
+
+    return copy.deepcopy(data)
+
+
+# gids files written by addLocation, keyed by the location request and the
+# weather file mtime, with the mtime the gids file was written at
+_GIDS_CACHE = {}
+
+
+def _mtime(file_path):
+    """
+    Helper function. Modification time of a file in ns, None if it does not exist.
+    """
+    try:
+        return os.stat(file_path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _stat_key(file_path):
+    """
+    Helper function. (modification time in ns, size) of a file, None if it does
+    not exist.
+    """
+    try:
+        st = os.stat(file_path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _hashable(value):
+    """
+    Helper function. Convert list-like location arguments to tuples so they can be
+    used in a cache key.
+    """
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return tuple(np.ravel(value).tolist())
+    return value
+
+
+@lru_cache(maxsize=None)
+def _cached_material(name):
+    """
+    Helper function. Read a material from materials.json once per name. Call
+    _cached_material.cache_clear() after the materials file is changed.
+
+    Parameters
+    ----------
+    name : str
+        unique name of material
+
+    Returns
+    -------
+    mat_dict : MappingProxyType
+        read-only view of the material parameters, shared between calls
+    """
+    return MappingProxyType(utils._read_material(name=name))
+
+
+def _json_default(obj):
+    """
+    Helper function. Serialize the read-only material views as plain dicts.
+    """
+    if isinstance(obj, MappingProxyType):
+        return dict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+@lru_cache(maxsize=1)
+def _function_registry():
+    """
+    Helper function. Map every public name of the pvdeg submodules and classes to
+    its object. Built once, on the first lookup, which imports every lazily
+    loaded submodule. Later entries win for names defined in several places.
+
+    Returns
+    -------
+    registry : dict
+        function name to callable (or other object)
+    """
+    registry = {}
+    for c in pvdeg.__all__:
+        # the config paths are not searched
+        if c.isupper():
+            continue
+        _class = getattr(pvdeg, c)
+        for name in dir(_class):
+            registry[name] = getattr(_class, name)
+
+    return registry
+
+
+@lru_cache(maxsize=None)
+def _required_params(func):
+    """
+    Helper function. Names of the parameters of func without a default value,
+    computed once per function.
+
+    Parameters
+    ----------
+    func : callable
+        pvdeg function
+
+    Returns
+    -------
+    reqs : tuple(str)
+        required parameter names, in signature order
+    """
+    return tuple(
+        name
+        for name, param in signature(func).parameters.items()
+        if param.default == param.empty
+    )
+
 
 class Scenario:
     """
@@ -22,8 +180,8 @@ class Scenario:
         name=None,
         path=None,
         gids=None,
-        modules=[],
-        pipeline=[],
+        modules=None,
+        pipeline=None,
         hpc=False,
         file=None,
     ) -> None:
@@ -40,7 +198,8 @@ class Scenario:
         gids : (str, pathObj)
             Spatial area to perform calculation for. This can be Country or Country and State.
         modules : (list, str)
-            List of module names to include in calculations.
+            List of module dictionaries ("module_name", "material_params") to include in
+            calculations.
         pipeline : (list, str)
             List of function names to run in job pipeline
         file : (path)
@@ -49,8 +208,7 @@ class Scenario:
         """
 
         if file is not None:
-            with open(file, "r") as f:
-                data = json.load()
+            data = _load_scenario_json(file)
             name = data["name"]
             path = data["path"]
             modules = data["modules"]
@@ -59,21 +217,30 @@ class Scenario:
 
         self.name = name
         self.path = path
-        self.modules = modules
+        # modules are keyed by module_name; files and callers pass a list of dicts
+        self.modules = {mod["module_name"]: mod for mod in modules or []}
         self.gids = gids
-        self.pipeline = pipeline
-
-        filedate = dt.strftime(date.today(), "%d%m%y")
+        self.pipeline = [] if pipeline is None else list(pipeline)
+        self.hpc = hpc
 
         if name is None:
-            name = filedate
+            name = dt.strftime(date.today(), "%d%m%y")
         self.name = name
 
         if path is None:
             self.path = os.path.join(os.getcwd(), f"pvd_job_{self.name}")
-            if not os.path.exists(self.path):
-                os.makedirs(self.path)
-        os.chdir(self.path)
+        # the directory is created by the first method that writes to it
+        self._path_ready = False
+        self._last_export = None
+
+    def _ensure_path(self):
+        """
+        Create the scenario directory on the first write.
+        """
+        if self._path_ready:
+            return
+        os.makedirs(self.path, exist_ok=True)
+        self._path_ready = True
 
     def addLocation(
         self, weather_fp=None, region=None, region_col="state", lat_long=None, gids=None
@@ -105,15 +272,34 @@ class Scenario:
         if not weather_fp:
             weather_fp = r"/datasets/NSRDB/current/nsrdb_tmy-2021.h5"
 
-        file_name = f"gids_{self.name}"
-        gids_path = utils.write_gids(
-            weather_fp,
-            region=region,
-            region_col=region_col,
-            lat_long=lat_long,
-            gids=gids,
-            out_fn=file_name,
+        # reuse a gids file already written for the same location and weather file
+        # in this process, copied into this scenario's directory
+        key = (
+            os.path.abspath(weather_fp),
+            _mtime(weather_fp),
+            region,
+            region_col,
+            _hashable(lat_long),
+            _hashable(gids),
         )
+        self._ensure_path()
+        file_name = os.path.join(self.path, f"gids_{self.name}")
+
+        hit = _GIDS_CACHE.get(key)
+        if hit is not None and _mtime(hit[0]) == hit[1]:
+            gids_path = f"{file_name}.csv"
+            if os.path.abspath(hit[0]) != os.path.abspath(gids_path):
+                shutil.copyfile(hit[0], gids_path)
+        else:
+            gids_path = utils.write_gids(
+                weather_fp,
+                region=region,
+                region_col=region_col,
+                lat_long=lat_long,
+                gids=gids,
+                out_fn=file_name,
+            )
+            _GIDS_CACHE[key] = (gids_path, _mtime(gids_path))
 
         self.gids = gids_path
         print(f"Location Added - {self.gids}")
@@ -144,25 +330,26 @@ class Scenario:
 
         # fetch material parameters (Eas, Ead, So, etc)
         try:
-            mat_params = utils._read_material(name=material)
-        except:
+            mat_params = _cached_material(material)
+        except KeyError:
             print("Material Not Found - No module added to scenario.")
             print("If you need to add a custom material, use .add_material()")
             return
 
-        # remove module if found in instance list
-        for i in range(self.modules.__len__()):
-            if self.modules[i]["module_name"] == module_name:
-                print(f'WARNING - Module already found by name "{module_name}"')
-                print("Module will be replaced with new instance.")
-                self.modules.pop(i)
+        # existing module of the same name is replaced below
+        if module_name in self.modules:
+            print(f'WARNING - Module already found by name "{module_name}"')
+            print("Module will be replaced with new instance.")
 
         # generate temperature model params
         # TODO: move to temperature based functions
         # temp_params = TEMPERATURE_MODEL_PARAMETERS[model][racking]
 
         # add the module and parameters
-        self.modules.append({"module_name": module_name, "material_params": mat_params})
+        self.modules[module_name] = {
+            "module_name": module_name,
+            "material_params": mat_params,
+        }
         print(f'Module "{module_name}" added.')
 
     def add_material(
@@ -182,6 +369,7 @@ class Scenario:
             Po=Po,
             fickian=fickian,
         )
+        _cached_material.cache_clear()
         print("Material has been added.")
         print("To add the material as a module in your current scene, run .addModule()")
 
@@ -190,15 +378,21 @@ class Scenario:
         Print all scenario information currently stored
         """
 
-        import pprint
-
-        pp = pprint.PrettyPrinter(indent=4, sort_dicts=False)
-        print(f"Name : {self.name}")
-        print(f"pipeline: {self.pipeline}")
-        print(f"gid file : {self.gids}")
-        print("test modules :")
-        for mod in self.modules:
-            pp.pprint(mod)
+        out = sys.stdout.write
+        out(
+            "\n".join(
+                [
+                    f"Name : {self.name}",
+                    f"pipeline: {self.pipeline}",
+                    f"gid file : {self.gids}",
+                    "test modules :",
+                    "",
+                ]
+            )
+        )
+        for mod in self.modules.values():
+            out(json.dumps(mod, indent=4, default=_json_default))
+            out("\n")
         return
 
     def addFunction(self, func_name=None, func_params=None):
@@ -222,12 +416,15 @@ class Scenario:
 
         _func, reqs = pvdeg.Scenario._verify_function(func_name)
 
-        if _func == None:
+        if _func is None:
             print(f'FAILED: Requested function "{func_name}" not found')
             print("Function has not been added to pipeline.")
             return None
 
-        if not all(x in func_params for x in reqs):
+        if func_params is None:
+            func_params = {}
+
+        if not set(reqs).issubset(func_params):
             print(
                 f"FAILED: Requestion function {func_name} did not receive enough parameters"
             )
@@ -242,26 +439,50 @@ class Scenario:
         self.pipeline.append(job_dict)
         return func_name
 
-    def runJob(self, job=None):
+    def runJob(self, job=None, n_jobs=1):
         """
         Run a named function on the scenario object
 
-        TODO: overhaul with futures/slurm
+        TODO: overhaul with slurm
               capture results
               standardize result format for all of pvdeg
 
         Parameters:
         -----------
         job : (str, default=None)
+        n_jobs : (int, default=1)
+            Number of worker processes used to run independent pipeline jobs
+            concurrently. The jobs and their parameters are pickled to spawned
+            workers, which run numba kernels on a single thread each. By default,
+            jobs run one after another, also for hpc scenarios.
         """
         if self.hpc:
             # do something else
             pass
 
-        for job in self.pipeline:
-            args = job["parameters"]
-            _func = pvdeg.Scenario._verify_function(job["job"], args)[0]
-            result = _func(**args)
+        # resolve every job name once, then dispatch from the bound list. The
+        # lookups themselves are memoized by _function_registry.
+        jobs = [
+            (Scenario._verify_function(job["job"])[0], job["params"])
+            for job in self.pipeline
+        ]
+
+        if n_jobs > 1 and len(jobs) > 1:
+            # Processes rather than threads: most jobs are pandas/pvlib code that
+            # holds the GIL, and numba parallel kernels must not be launched from
+            # several threads at once. Workers are spawned, forking a process
+            # with a running numba thread pool can deadlock.
+            with ProcessPoolExecutor(
+                max_workers=min(n_jobs, len(jobs)),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=utils._single_numba_thread,
+            ) as executor:
+                futures = [executor.submit(_func, **params) for _func, params in jobs]
+                # re-raise the first job failure, in pipeline order
+                results = [future.result() for future in futures]
+        else:
+            for _func, params in jobs:
+                result = _func(**params)
 
     def exportScenario(self, file_path=None):
         """
@@ -278,6 +499,7 @@ class Scenario:
         """
 
         if not file_path:
+            self._ensure_path()
             file_path = self.path
         file_name = f"config_{self.name}.json"
         out_file = os.path.join(file_path, file_name)
@@ -285,13 +507,22 @@ class Scenario:
         scene_dict = {
             "name": self.name,
             "path": self.path,
+            "gids": self.gids,
+            "modules": list(self.modules.values()),
             "pipeline": self.pipeline,
-            "gid_file": self.gids,
-            "test_modules": self.modules,
         }
 
-        with open(out_file, "w") as f:
-            json.dump(scene_dict, f, indent=4)
+        # skip the write when this exact content was already exported to out_file,
+        # and the file has not been touched since
+        payload = json.dumps(scene_dict, indent=4, default=_json_default).encode()
+        digest = hashlib.blake2b(payload, digest_size=16).digest()
+        if self._last_export == (out_file, digest, _stat_key(out_file)):
+            print(f"{file_name} unchanged")
+            return
+
+        with open(out_file, "wb") as f:
+            f.write(payload)
+        self._last_export = (out_file, digest, _stat_key(out_file))
         print(f"{file_name} exported")
 
     def importScenario(self, file_path=None):
@@ -299,8 +530,7 @@ class Scenario:
         Import scenario dictionaries from an existing 'scenario.json' file
         """
 
-        with open(file_path, "r") as f:
-            data = json.load()
+        data = _load_scenario_json(file_path)
         name = data["name"]
         path = data["path"]
         modules = data["modules"]
@@ -309,10 +539,13 @@ class Scenario:
 
         self.name = name
         self.path = path
-        self.modules = modules
+        self.modules = {mod["module_name"]: mod for mod in modules}
         self.gids = gids
         self.pipeline = pipeline
+        self._path_ready = False
+        self._last_export = None
 
+    @staticmethod
     def _verify_function(func_name):
         """
         Check all classes in pvdeg for a function of the name "func_name". Returns a callable function
@@ -330,23 +563,13 @@ class Scenario:
         reqs : (list(str))
             list of minimum required paramters to run the requested funciton
         """
-        from inspect import signature
-
-        # find the function in pvdeg
-        class_list = [c for c in dir(pvdeg) if not c.startswith("_")]
-        func_list = []
-        for c in class_list:
-            _class = getattr(pvdeg, c)
-            if func_name in dir(_class):
-                _func = getattr(_class, func_name)
-        if _func == None:
+
+        # find the function in pvdeg, the name index is only built once
+        _func = _function_registry().get(func_name)
+        if _func is None:
             return (None, None)
 
         # check if necessary parameters given
-        reqs_all = signature(_func).parameters
-        reqs = []
-        for param in reqs_all:
-            if reqs_all[param].default == reqs_all[param].empty:
-                reqs.append(param)
+        reqs = list(_required_params(_func))
 
         return (_func, reqs)
@@ -7,6 +7,7 @@ from pvdeg import DATA_DIR
 from typing import Callable
 import inspect
 import math
+from functools import lru_cache
 
 
 def gid_downsampling(meta, n):
@@ -86,6 +87,48 @@ def get_kinetics(name=None, fname="kinetic_parameters.json"):
     return kinetic_parameters
 
 
+def _region_index(nsrdb_fp, region_col):
+    """
+    Helper function. Region of every gid of an NSRDB h5 file. Each region column is
+    read once and reused until the file's modification time changes.
+
+    Parameters:
+    -----------
+    nsrdb_fp : (str, path_obj)
+        full file path to the NSRDB h5 file
+    region_col : (str)
+        Name of the NSRDB region type
+
+    Returns:
+    --------
+    regions : (pd.Series)
+        region of each gid, indexed by gid, shared between calls. Do not modify.
+    """
+    nsrdb_fp = os.path.abspath(nsrdb_fp)
+    return _read_region_index(nsrdb_fp, os.stat(nsrdb_fp).st_mtime_ns, region_col)
+
+
+@lru_cache(maxsize=8)
+def _read_region_index(nsrdb_fp, mtime, region_col):
+    """
+    Helper function. Cached read behind _region_index, mtime is only part of the
+    cache key.
+    """
+    with NSRDBX(nsrdb_fp, hsds=False) as f:
+        return f.meta[region_col]
+
+
+def _single_numba_thread():
+    """
+    Helper function. Worker process initializer, limits numba's parallel kernels to
+    a single thread. The worker processes already cover the cores, and numba's
+    workqueue threading layer does not allow concurrent parallel launches.
+    """
+    import numba
+
+    numba.set_num_threads(1)
+
+
 def write_gids(
     nsrdb_fp,
     region="Colorado",
@@ -120,13 +163,14 @@ def write_gids(
     """
 
     if not gids:
-        with NSRDBX(nsrdb_fp, hsds=False) as f:
-            if lat_long:
+        if lat_long:
+            with NSRDBX(nsrdb_fp, hsds=False) as f:
                 gids = f.lat_lon_gid(lat_long)
                 if isinstance(gids, int):
                     gids = [gids]
-            else:
-                gids = f.region_gids(region=region, region_col=region_col)
+        else:
+            regions = _region_index(nsrdb_fp, region_col)
+            gids = regions.index.values[(regions == region).values]
 
     file_out = f"{out_fn}.csv"
     df_gids = pd.DataFrame(gids, columns=["gid"])
@@ -269,6 +313,27 @@ def convert_tmy(file_in, file_out="h5_from_tmy.h5"):
         )
 
 
+@lru_cache(maxsize=None)
+def _materials_table(fname="materials.json"):
+    """
+    Helper function. Parse a materials file from the data directory once.
+    _add_material clears this cache after it rewrites the file.
+
+    Parameters:
+    -----------
+    fname : (str)
+        name of the materials .json file in the data directory
+
+    Returns:
+    --------
+    data : (dict)
+        material name to parameter dictionary, shared between calls. Do not modify.
+    """
+    fpath = os.path.join(DATA_DIR, fname)
+    with open(fpath) as f:
+        return json.load(f)
+
+
 def _read_material(name, fname="materials.json"):
     """
     read a material from materials.json and return the parameter dictionary
@@ -287,9 +352,7 @@ def _read_material(name, fname="materials.json"):
     # root = os.path.realpath(__file__)
     # root = root.split(r'/')[:-1]
     # file = os.path.join('/', *root, 'data', 'materials.json')
-    fpath = os.path.join(DATA_DIR, fname)
-    with open(fpath) as f:
-        data = json.load(f)
+    data = _materials_table(fname)
 
     if name is None:
         material_list = data.keys()
@@ -362,6 +425,7 @@ def _add_material(
 
     with open(fpath, "w") as f:
         json.dump(data, f, indent=4)
+    _materials_table.cache_clear()
 
 
 def quantile_df(file, q):
@@ -8,6 +8,7 @@ to run coverage tests, run py.test --cov-report term-missing --cov=pvdeg
 import os
 import pandas as pd
 import numpy as np
+import xarray as xr
 import pytest
 import pvdeg
 from pvdeg import TEST_DATA_DIR
@@ -18,6 +19,16 @@ weather_df, meta = pvdeg.weather.read(PSM_FILE, "psm")
 INPUT_SPECTRA = os.path.join(TEST_DATA_DIR, r"spectra_pytest.csv")
 
 
+def read_spectra():
+    """
+    Read the spectra test file and parse its bracketed spectra strings into a
+    (time, wavelength) array.
+    """
+    data = pd.read_csv(INPUT_SPECTRA)
+    spectra = np.array([np.fromstring(s.strip("[]"), sep=",") for s in data["Spectra"]])
+    return data, spectra
+
+
 def test_vantHoff_deg():
     # test the vantHoff degradation acceleration factor
 
@@ -60,9 +71,55 @@ def test_arrhenius_deg():
         Ea=Ea,
         poa=poa,
     )
+    assert isinstance(arrhenius_deg, float)
     assert arrhenius_deg == pytest.approx(12.804, abs=0.1)
 
 
+def test_arrhenius_deg_sites():
+    # test the arrhenius acceleration factor over a (sites, time) array
+
+    poa = pvdeg.spectral.poa_irradiance(weather_df, meta)
+    temp_module = pvdeg.temperature.module(weather_df, meta, poa=poa)
+
+    rh_surface = pvdeg.humidity.surface_outside(
+        rh_ambient=weather_df["relative_humidity"],
+        temp_ambient=weather_df["temp_air"],
+        temp_module=temp_module,
+    )
+    kwargs = dict(
+        weather_df=weather_df,
+        meta=meta,
+        I_chamber=1e3,
+        rh_chamber=15,
+        temp_chamber=60,
+        Ea=40,
+        poa=poa,
+    )
+    expected = pvdeg.degradation.arrhenius_deg(rh_outdoor=rh_surface, **kwargs)
+    arrhenius_deg = pvdeg.degradation.arrhenius_deg(
+        rh_outdoor=np.vstack([rh_surface, rh_surface]), **kwargs
+    )
+    assert arrhenius_deg.shape == (2,)
+    assert arrhenius_deg == pytest.approx([expected, expected], rel=1e-9)
+
+
+def test_arrhenius_denominator():
+    # test the environment degradation rate against the plain formula
+
+    poa_global = pd.Series([0.0, 250.0, 800.0])
+    rh_outdoor = pd.Series([90.0, 40.0, 20.0])
+    temp = pd.Series([10.0, 25.0, 55.0])
+    rate = pvdeg.degradation._arrhenius_denominator(
+        poa_global=poa_global, rh_outdoor=rh_outdoor, temp=temp, Ea=40, p=0.5, n=1
+    )
+    expected = (
+        poa_global**0.5
+        * rh_outdoor
+        * np.exp(-40 / (0.00831446261815324 * (temp + 273.15)))
+    )
+    np.testing.assert_allclose(rate, expected, rtol=1e-12)
+
+
 def test_iwa_arrhenius():
     # test arrhenius equivalent weighted average irradiance
     # requires PSM3 weather file
@@ -91,3 +148,126 @@ def test_degradation():
         wavelengths=wavelengths,
     )
     assert degradation == pytest.approx(4.4969e-38, abs=0.02e-38)
+
+
+def test_degradation_array():
+    # test spectral degradation with a (time, wavelength) array of spectra
+
+    data, spectra = read_spectra()
+    wavelengths = np.array(range(280, 420, 20))
+    degradation = pvdeg.degradation.degradation(
+        spectra=spectra,
+        rh_module=data["RH"].to_numpy(),
+        temp_module=data["Temperature"].to_numpy(),
+        wavelengths=wavelengths,
+    )
+    assert degradation == pytest.approx(4.4969e-38, abs=0.02e-38)
+
+
+@pytest.mark.parametrize("container", ["dataframe", "dataarray"])
+def test_degradation_array_containers(container):
+    # test spectral degradation with wide DataFrame and DataArray spectra
+
+    data, spectra = read_spectra()
+    wavelengths = np.array(range(280, 420, 20))
+    if container == "dataframe":
+        spectra = pd.DataFrame(spectra, columns=wavelengths)
+    else:
+        spectra = xr.DataArray(
+            spectra, dims=["time", "wavelength"], coords={"wavelength": wavelengths}
+        )
+    degradation = pvdeg.degradation.degradation(
+        spectra=spectra,
+        rh_module=data["RH"],
+        temp_module=data["Temperature"],
+        wavelengths=wavelengths,
+    )
+    assert degradation == pytest.approx(4.4969e-38, abs=0.02e-38)
+
+
+def test_degradation_nonuniform_wavelengths():
+    # non-uniform wavelength bins against the plain double integral
+
+    data, spectra = read_spectra()
+    wavelengths = np.array([280, 290, 310, 330, 360, 380, 400])
+    degradation = pvdeg.degradation.degradation(
+        spectra=spectra,
+        rh_module=data["RH"],
+        temp_module=data["Temperature"],
+        wavelengths=wavelengths,
+    )
+
+    wav_bin = np.append(np.diff(wavelengths), 20)
+    G_integral = ((spectra * np.exp(-0.07 * wavelengths) * wav_bin) ** 0.5).sum(axis=1)
+    arr_integrand = np.exp(-40 / 0.0083145 / data["Temperature"]) * data["RH"]
+    expected = (G_integral * arr_integrand).sum()
+    assert degradation == pytest.approx(expected, rel=1e-5)
+
+
+def test_degradation_nan():
+    # NaN timesteps and wavelengths are skipped, like the pandas sums they replace
+
+    data, spectra = read_spectra()
+    wavelengths = np.array(range(280, 420, 20))
+    expected = pvdeg.degradation.degradation(
+        spectra=spectra[1:],
+        rh_module=data["RH"].to_numpy()[1:],
+        temp_module=data["Temperature"].to_numpy()[1:],
+        wavelengths=wavelengths,
+    )
+
+    rh_module = data["RH"].to_numpy(dtype=float)
+    rh_module[0] = np.nan
+    degradation = pvdeg.degradation.degradation(
+        spectra=spectra,
+        rh_module=rh_module,
+        temp_module=data["Temperature"],
+        wavelengths=wavelengths,
+    )
+    assert np.isfinite(degradation)
+    assert degradation == pytest.approx(expected, rel=1e-6)
+
+    spectra[0, :] = np.nan
+    degradation = pvdeg.degradation.degradation(
+        spectra=spectra,
+        rh_module=data["RH"],
+        temp_module=data["Temperature"],
+        wavelengths=wavelengths,
+    )
+    assert degradation == pytest.approx(expected, rel=1e-6)
+
+
+def test_degradation_batch():
+    # test spectral degradation of several sites in worker processes
+
+    data, spectra = read_spectra()
+    wavelengths = np.array(range(280, 420, 20))
+    degradation = pvdeg.degradation.degradation_batch(
+        spectra=np.stack([spectra, spectra]),
+        rh_module=np.stack([data["RH"], data["RH"]]),
+        temp_module=np.stack([data["Temperature"], data["Temperature"]]),
+        wavelengths=wavelengths,
+        n_workers=2,
+    )
+    assert degradation.shape == (2,)
+    assert degradation == pytest.approx(4.4969e-38, abs=0.02e-38)
+
+    empty = pvdeg.degradation.degradation_batch(
+        spectra=np.empty((0,) + spectra.shape),
+        rh_module=np.empty((0, len(data))),
+        temp_module=np.empty((0, len(data))),
+        wavelengths=wavelengths,
+    )
+    assert empty.shape == (0,)
+
+
+def test_hours_rh_above85():
+    # count hours above 85% RH, per column for a DataFrame
+
+    rh = pd.DataFrame({"front": [80.0, 86.0, 90.0], "back": [90.0, 70.0, 60.0]})
+    assert pvdeg.degradation._hoursRH_Above85(rh["front"]) == 2
+    assert pvdeg.degradation._hoursRH_Above85(rh["front"].to_numpy()) == 2
+    pd.testing.assert_series_equal(
+        pvdeg.degradation._hoursRH_Above85(rh),
+        pd.Series({"front": 2, "back": 1}),
+    )
@@ -0,0 +1,171 @@
+"""
+Using pytest to create unit tests for pvdeg
+
+to run unit tests, run pytest from the command line in the pvdeg directory
+to run coverage tests, run py.test --cov-report term-missing --cov=pvdeg
+"""
+
+import os
+import pandas as pd
+import numpy as np
+import xarray as xr
+import pytest
+from dask.distributed import Client, LocalCluster
+import pvdeg
+from pvdeg import geospatial, humidity, standards, TEST_DATA_DIR
+
+PSM_FILE = os.path.join(TEST_DATA_DIR, r"psm3_pytest.csv")
+weather_df, meta = pvdeg.weather.read(PSM_FILE, "psm")
+weather_df = weather_df[
+    ["temp_air", "relative_humidity", "dhi", "ghi", "dni", "wind_speed"]
+].iloc[:168]
+
+# six sites on a 2 x 3 (latitude, longitude) grid, with slightly scaled weather
+GIDS = np.arange(100, 106)
+weather_ds = xr.Dataset(
+    {
+        var: (
+            ("gid", "time"),
+            np.stack([weather_df[var].to_numpy() * (1 + 0.01 * i) for i in range(6)]),
+        )
+        for var in weather_df.columns
+    },
+    coords={"gid": GIDS, "time": weather_df.index.tz_localize(None)},
+).chunk({"gid": 2, "time": -1})
+meta_df = pd.DataFrame(
+    [
+        {
+            **{k: v for k, v in meta.items() if np.isscalar(v)},
+            "latitude": meta["latitude"] + i // 3,
+            "longitude": meta["longitude"] + i % 3,
+        }
+        for i in range(6)
+    ],
+    index=pd.Index(GIDS, name="gid"),
+)
+
+
+def expected_standoff():
+    # standoff of every site, computed one gid at a time
+    res = {}
+    for i, gid in enumerate(GIDS):
+        site_weather = weather_df * (1 + 0.01 * i)
+        site_weather.index = site_weather.index.tz_localize(None)
+        res[gid] = standards.standoff(
+            weather_df=site_weather, meta=meta_df.loc[gid].to_dict()
+        ).iloc[0]
+    return res
+
+
+def assert_on_grid(res, expected):
+    # each gid result sits at the (latitude, longitude) cell of that gid
+    for gid, values in expected.items():
+        cell = res.sel(
+            latitude=meta_df.loc[gid, "latitude"],
+            longitude=meta_df.loc[gid, "longitude"],
+        )
+        for var, value in values.items():
+            assert cell[var].item() == pytest.approx(value, rel=1e-9)
+
+
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_analysis(n_jobs):
+    res = geospatial.analysis(weather_ds, meta_df, standards.standoff, n_jobs=n_jobs)
+    assert dict(res.sizes) == {"latitude": 2, "longitude": 3}
+    assert res["x"].attrs["units"] == "cm"
+    assert_on_grid(res, expected_standoff())
+
+
+def test_analysis_client():
+    # meta_df is scattered to the workers, repeated calls must find it again
+    expected = expected_standoff()
+    with LocalCluster(n_workers=1, processes=False) as cluster, Client(cluster):
+        for _ in range(2):
+            res = geospatial.analysis(weather_ds, meta_df, standards.standoff)
+            assert_on_grid(res, expected)
+
+
+def test_analysis_time_series():
+    res = geospatial.analysis(weather_ds, meta_df, humidity.module)
+    assert res["RH_front_encap"].dims == ("time", "latitude", "longitude")
+
+    site = humidity.module(
+        weather_df=weather_ds.isel(gid=4).to_dataframe().drop(columns="gid"),
+        meta=meta_df.iloc[4].to_dict(),
+    )
+    np.testing.assert_allclose(
+        res["RH_front_encap"].isel(latitude=1, longitude=1).values,
+        site["RH_front_encap"].to_numpy(),
+    )
+
+
+@pytest.mark.parametrize("grid", ["full", "sparse", "duplicated"])
+def test_grid_gids(grid):
+    lats = [1.0, 1.0, 1.0, 2.0, 2.0, 2.0]
+    lons = [5.0, 6.0, 7.0, 5.0, 6.0, 7.0]
+    if grid == "sparse":
+        lats, lons = lats[:5], lons[:5]
+    elif grid == "duplicated":
+        lats[5], lons[5] = 1.0, 6.0
+    n = len(lats)
+    gid_meta = pd.DataFrame(
+        {"latitude": lats, "longitude": lons}, index=pd.Index(GIDS[:n], name="gid")
+    )
+    stacked = xr.Dataset(
+        {
+            "a": ("gid", np.arange(n)),
+            "b": (("gid", "time"), np.arange(n * 3.0).reshape(n, 3)),
+        },
+        coords={"time": [0, 1, 2]},
+    )
+
+    res = geospatial._grid_gids(stacked, gid_meta)
+    assert res["b"].dims == ("time", "latitude", "longitude")
+    assert res["a"].sel(latitude=1.0, longitude=6.0).item() == 1
+    np.testing.assert_array_equal(
+        res["b"].sel(latitude=2.0, longitude=6.0).values, [12.0, 13.0, 14.0]
+    )
+
+    if grid == "full":
+        assert res["a"].dtype == stacked["a"].dtype
+    elif grid == "sparse":
+        assert np.isnan(res["a"].sel(latitude=2.0, longitude=7.0).item())
+        assert np.isnan(res["b"].sel(latitude=2.0, longitude=7.0).values).all()
+    else:
+        # the first gid of a repeated cell is kept, the empty cell is NaN
+        assert np.isnan(res["a"].sel(latitude=2.0, longitude=7.0).item())
+
+
+def test_analysis_ufunc():
+    def kernel(rh, temp):
+        return (
+            humidity.surface_outside(rh, temp, temp + 10),
+            humidity.psat(temp, average=False),
+        )
+
+    res = geospatial.analysis_ufunc(
+        weather_ds,
+        meta_df,
+        kernel,
+        ["relative_humidity", "temp_air"],
+        ["RH_surface_outside", "psat"],
+    )
+    assert res["psat"].dims == ("time", "latitude", "longitude")
+
+    site = weather_ds.isel(gid=5)
+    np.testing.assert_allclose(
+        res["RH_surface_outside"].isel(latitude=1, longitude=2).values,
+        humidity.surface_outside(
+            site["relative_humidity"].values,
+            site["temp_air"].values,
+            site["temp_air"].values + 10,
+        ),
+    )
+
+    res = geospatial.analysis_ufunc(
+        weather_ds, meta_df, lambda temp: temp * 2, ["temp_air"], ["double"]
+    )
+    np.testing.assert_allclose(
+        res["double"].isel(latitude=0, longitude=0).values,
+        weather_ds["temp_air"].isel(gid=0).values * 2,
+    )
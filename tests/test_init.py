@@ -0,0 +1,32 @@
+"""
+Using pytest to create unit tests for pvdeg
+
+to run unit tests, run pytest from the command line in the pvdeg directory
+to run coverage tests, run py.test --cov-report term-missing --cov=pvdeg
+"""
+
+import subprocess
+import sys
+import pvdeg
+
+
+def test_lazy_submodules():
+    # submodules are only imported on first attribute access
+    code = (
+        "import sys, pvdeg\n"
+        "assert 'pvdeg.degradation' not in sys.modules\n"
+        "assert 'numba' not in sys.modules\n"
+        "pvdeg.degradation\n"
+        "assert 'pvdeg.degradation' in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_public_names():
+    assert "degradation" in dir(pvdeg)
+    assert "Scenario" in pvdeg.__all__
+    assert pvdeg.Scenario is pvdeg.scenario.Scenario
+
+    namespace = {}
+    exec("from pvdeg import *", namespace)
+    assert set(pvdeg.__all__) <= set(namespace)
@@ -0,0 +1,151 @@
+"""
+Using pytest to create unit tests for pvdeg
+
+to run unit tests, run pytest from the command line in the pvdeg directory
+to run coverage tests, run py.test --cov-report term-missing --cov=pvdeg
+"""
+
+import json
+import numpy as np
+import pytest
+import pvdeg
+from pvdeg.scenario import Scenario
+
+
+def test_verify_function():
+    _func, reqs = Scenario._verify_function("vantHoff_deg")
+    assert _func is pvdeg.degradation.vantHoff_deg
+    assert reqs == ["weather_df", "meta", "I_chamber", "temp_chamber"]
+
+    assert Scenario._verify_function("not_a_pvdeg_function") == (None, None)
+
+
+def test_scenario_defaults_not_shared(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    a = Scenario(name="a", path=str(tmp_path))
+    b = Scenario(name="b", path=str(tmp_path))
+    a.pipeline.append({"job": "vantHoff_deg", "params": {}})
+    a.modules["m"] = {"module_name": "m", "material_params": {}}
+    assert b.pipeline == []
+    assert b.modules == {}
+
+
+def test_add_module_replaces(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    scene = Scenario(name="mods", path=str(tmp_path))
+    scene.addModule("mod_a", material="EVA")
+    scene.addModule("mod_b", material="EVA")
+    scene.addModule("mod_a", material="EVA")
+    assert list(scene.modules) == ["mod_a", "mod_b"]
+    assert scene.modules["mod_a"]["module_name"] == "mod_a"
+
+
+def test_scenario_path_created_on_write(tmp_path):
+    path = tmp_path / "scene"
+    scene = Scenario(name="lazy", path=str(path))
+    assert not path.exists()
+    scene.exportScenario()
+    assert (path / "config_lazy.json").exists()
+
+
+def test_run_job(tmp_path):
+    scene = Scenario(name="jobs", path=str(tmp_path))
+    assert scene.addFunction("psat", {"temp": 25.0}) == "psat"
+    assert scene.addFunction("psat", {}) is None
+    assert scene.addFunction("psat") is None
+    assert scene.pipeline == [{"job": "psat", "params": {"temp": 25.0}}]
+    scene.runJob()
+    scene.addFunction("psat", {"temp": 30.0})
+    scene.runJob()
+    scene.runJob(n_jobs=2)
+
+    # direct edits of the pipeline list are picked up by the next run
+    scene.pipeline.append({"job": "psat", "params": {}})
+    with pytest.raises(TypeError):
+        scene.runJob()
+    scene.pipeline = []
+    scene.runJob()
+
+
+def test_add_location_reuses_gids(tmp_path):
+    weather_fp = str(tmp_path / "weather.h5")
+    first = Scenario(name="first", path=str(tmp_path / "first"))
+    first.addLocation(weather_fp=weather_fp, gids=[1, 2, 3])
+    second = Scenario(name="second", path=str(tmp_path / "second"))
+    second.addLocation(weather_fp=weather_fp, gids=[1, 2, 3])
+    assert second.gids == str(tmp_path / "second" / "gids_second.csv")
+    with open(first.gids) as f, open(second.gids) as g:
+        assert f.read() == g.read()
+
+
+def test_export_skips_unchanged(tmp_path):
+    scene = Scenario(name="export", path=str(tmp_path))
+    out_file = tmp_path / "config_export.json"
+    scene.exportScenario()
+    mtime = out_file.stat().st_mtime_ns
+    scene.exportScenario()
+    assert out_file.stat().st_mtime_ns == mtime
+
+    # a hand edited file is overwritten again
+    out_file.write_text("{}")
+    scene.exportScenario()
+    assert json.loads(out_file.read_text())["name"] == "export"
+
+    scene.addFunction("psat", {"temp": 25.0})
+    scene.exportScenario()
+    assert json.loads(out_file.read_text())["pipeline"] == scene.pipeline
+
+
+def test_module_material_shared(tmp_path):
+    a = Scenario(name="a", path=str(tmp_path))
+    b = Scenario(name="b", path=str(tmp_path))
+    a.addModule("mod", material="EVA")
+    b.addModule("mod", material="EVA")
+    params = a.modules["mod"]["material_params"]
+    assert params is b.modules["mod"]["material_params"]
+
+    a.exportScenario()
+    data = json.loads((tmp_path / "config_a.json").read_text())
+    assert data["modules"][0]["material_params"] == dict(params)
+
+
+def test_add_module_unknown_material(tmp_path):
+    scene = Scenario(name="mat", path=str(tmp_path))
+    scene.addModule("mod", material="not_a_material")
+    assert scene.modules == {}
+
+
+def test_export_import_roundtrip(tmp_path):
+    scene = Scenario(name="trip", path=str(tmp_path), gids="gids_trip.csv")
+    scene.addModule("mod", material="EVA")
+    scene.addFunction("psat", {"temp": 25.0})
+    scene.exportScenario()
+
+    loaded = Scenario(file=str(tmp_path / "config_trip.json"))
+    assert loaded.name == "trip"
+    assert loaded.gids == "gids_trip.csv"
+    assert loaded.pipeline == scene.pipeline
+    assert loaded.modules["mod"]["material_params"] == dict(
+        scene.modules["mod"]["material_params"]
+    )
+
+
+def test_import_not_shared(tmp_path):
+    scene = Scenario(name="owned", path=str(tmp_path))
+    scene.addModule("mod", material="EVA")
+    scene.exportScenario()
+    file = str(tmp_path / "config_owned.json")
+
+    first = Scenario(file=file)
+    first.modules["mod"]["material_params"]["Ead"] = -1
+    first.pipeline.append({"job": "psat", "params": {"temp": 25.0}})
+    second = Scenario(file=file)
+    assert second.modules["mod"]["material_params"]["Ead"] != -1
+    assert second.pipeline == []
+
+
+def test_export_rejects_unserializable(tmp_path):
+    scene = Scenario(name="bad", path=str(tmp_path))
+    scene.pipeline.append({"job": "psat", "params": {"temp": np.int64(25)}})
+    with pytest.raises(TypeError):
+        scene.exportScenario()
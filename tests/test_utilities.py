@@ -37,8 +37,14 @@ def test_gid_downsampling():
     pass
 
 
-def test_write_gids():
-    pass
+def test_write_gids(tmp_path):
+    regions = pvdeg.utilities._region_index(FILES["h5"], "state")
+    region = regions.iloc[0]
+    file_out = pvdeg.utilities.write_gids(
+        FILES["h5"], region=region, out_fn=str(tmp_path / "gids")
+    )
+    gids = pd.read_csv(file_out)["gid"]
+    assert gids.tolist() == regions.index[regions == region].tolist()
 
 
 def test_convert_tmy():